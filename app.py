@@ -1,322 +1,694 @@
-import os
-import logging
-import requests
-from flask import Flask, request, jsonify
-from dotenv import load_dotenv
-import re
-
-# Load environment variables
-load_dotenv()
-
-# Logging configuration
-logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
-
-# Flask app setup
-app = Flask(__name__)
-
-# Bluesky API configuration
-API_URL = "https://bsky.social/xrpc"
-USERNAME = os.getenv("BLUESKY_USERNAME")
-PASSWORD = os.getenv("BLUESKY_APP_PASSWORD")
-
-# Authentication token
-access_token = None
-
-
-def get_access_token():
-    """Authenticate with Bluesky and retrieve an access token."""
-    global access_token
-    try:
-        logging.info("Attempting to log into Bluesky...")
-        response = requests.post(
-            f"{API_URL}/com.atproto.server.createSession",
-            json={"identifier": USERNAME, "password": PASSWORD},
-        )
-        response.raise_for_status()
-        data = response.json()
-        access_token = data.get("accessJwt")
-        if not access_token:
-            raise ValueError("Access token not retrieved.")
-        logging.info("Login successful. Access token retrieved.")
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error during Bluesky authentication: {e}")
-        raise Exception("Authentication failed. Check your username and password.")
-
-
-def resolve_did(handle):
-    """Resolve a Bluesky handle to its DID."""
-    global access_token
-    headers = {"Authorization": f"Bearer {access_token}"}
-    try:
-        logging.info(f"Resolving DID for handle: {handle}")
-        response = requests.get(
-            f"{API_URL}/com.atproto.identity.resolveHandle",
-            headers=headers,
-            params={"handle": handle},
-        )
-        response.raise_for_status()
-        data = response.json()
-        did = data.get("did")
-        if did:
-            logging.info(f"Resolved DID for {handle}: {did}")
-            return did
-        else:
-            logging.error(f"Failed to resolve DID for handle: {handle}")
-            return None
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error resolving DID for handle {handle}: {e}")
-        return None
-
-
-def fetch_username_from_did(api_url, access_token, did):
-    """Fetch the username (handle) associated with a DID using the Bluesky API."""
-    headers = {"Authorization": f"Bearer {access_token}"}
-    try:
-        response = requests.get(f"{api_url}/app.bsky.actor.getProfile", headers=headers, params={"actor": did})
-        response.raise_for_status()
-        handle = response.json().get("handle")
-        logging.info(f"Resolved handle for DID {did}: {handle}")
-        return handle
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching username for DID {did}: {e}")
-        return None
-
-
-def generate_chart(colors, title, xlabel, ylabel, dates, counts, chart_image_path):
-    """General function to generate a styled bar chart."""
-    import matplotlib.pyplot as plt
-
-    plt.figure(figsize=(10, 6))
-    plt.bar(dates, counts, width=0.5, align="center", color=colors)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.title(title, fontsize=12, color="#ff69b4")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(chart_image_path)
-    plt.close()
-    logging.info(f"Chart saved to {chart_image_path}")
-
-
-def generate_likes_chart(handle, like_timestamps, post_link):
-    """Generate and save a likes chart."""
-    from collections import Counter
-    from datetime import datetime
-
-    logging.info("Generating likes chart...")
-    dates = [datetime.fromisoformat(ts.split("T")[0]) for ts in like_timestamps]
-    date_counts = Counter(dates)
-    sorted_dates = sorted(date_counts.keys())
-    counts = [date_counts[date] for date in sorted_dates]
-
-    chart_image_path = "static/likes_chart.png"
-    colors = ["#ff69b4" for _ in sorted_dates]
-    generate_chart(
-        colors,
-        f"Likes Over Time for @{handle}\nPost: {post_link}",
-        "Date",
-        "Number of Likes",
-        sorted_dates,
-        counts,
-        chart_image_path,
-    )
-    return chart_image_path
-
-
-def generate_reposts_chart(handle, reposts):
-    """Generate and save a reposts chart."""
-    from collections import Counter
-    from datetime import datetime
-
-    logging.info("Generating reposts chart...")
-    repost_timestamps = [repost["indexedAt"] for repost in reposts if "indexedAt" in repost]
-    dates = [datetime.fromisoformat(ts.split("T")[0]) for ts in repost_timestamps]
-    date_counts = Counter(dates)
-    sorted_dates = sorted(date_counts.keys())
-    counts = [date_counts[date] for date in sorted_dates]
-
-    chart_image_path = "static/reposts_chart.png"
-    colors = ["#ff85c0" for _ in sorted_dates]
-    generate_chart(
-        colors,
-        f"Reposts Over Time for @{handle}",
-        "Date",
-        "Number of Reposts",
-        sorted_dates,
-        counts,
-        chart_image_path,
-    )
-    return chart_image_path
-
-
-@app.route("/")
-def home():
-    """Render the home page."""
-    return """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Bluesky Data Visualizer</title>
-        <style>
-            body {
-                font-family: Arial, sans-serif;
-                margin: 0;
-                padding: 0;
-                background: linear-gradient(135deg, #ff69b4, #ff85c0, #ff99cc);
-                color: white;
-                text-align: center;
-            }
-            h1 {
-                font-size: 3em;
-                margin-top: 20px;
-                text-shadow: 2px 2px 5px rgba(0, 0, 0, 0.3);
-            }
-            form {
-                margin: 20px auto;
-                padding: 15px;
-                background-color: rgba(255, 255, 255, 0.1);
-                border-radius: 10px;
-                box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
-                max-width: 400px;
-            }
-            label {
-                font-size: 1.2em;
-                display: block;
-                margin-bottom: 10px.
-            input {
-                width: 90%;
-                padding: 10px;
-                margin-bottom: 20px;
-                border: none;
-                border-radius: 5px;
-                box-shadow: 0 2px 5px rgba(0, 0, 0, 0.1);
-                font-size: 1em;
-            }
-            button {
-                background-color: #ff69b4;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 5px;
-                font-size: 1em;
-                cursor: pointer;
-                transition: background-color 0.3s ease;
-            }
-            button:hover {
-                background-color: #ff85c0;
-            }
-            #result img {
-                margin-top: 20px;
-                max-width: 100%;
-                border: 3px solid #ff85c0;
-                border-radius: 10px;
-                box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
-            }
-        </style>
-    </head>
-    <body>
-        <h1>Bluesky Data Visualizer</h1>
-        <form id="chart-form" method="post" action="/generate">
-            <label for="link">Enter a Bluesky post link:</label>
-            <input type="text" id="link" name="link" placeholder="https://bsky.app/profile/..." required>
-            <button type="submit">Generate Charts</button>
-        </form>
-        <div id="result">
-            <!-- Graph or chart will appear here -->
-        </div>
-        <script>
-            const form = document.getElementById("chart-form");
-            form.addEventListener("submit", async (event) => {
-                event.preventDefault();
-                const link = document.getElementById("link").value;
-                const response = await fetch("/generate", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify({ link }),
-                });
-                const data = await response.json();
-                if (data.likes_chart || data.reposts_chart) {
-                    const resultDiv = document.getElementById("result");
-                    resultDiv.innerHTML = `
-                        ${data.likes_chart ? `<img src="/${data.likes_chart}" alt="Likes Chart">` : ''}
-                        ${data.reposts_chart ? `<img src="/${data.reposts_chart}" alt="Reposts Chart">` : ''}
-                    `;
-                } else {
-                    alert("Error: " + data.error);
-                }
-            });
-        </script>
-    </body>
-    </html>
-    """
-
-
-@app.route("/generate", methods=["POST"])
-def generate_charts():
-    """Generate both likes and reposts charts from a single Bluesky link."""
-    global access_token
-    try:
-        if not access_token:
-            get_access_token()
-
-        data = request.json
-        if not data or "link" not in data:
-            logging.error("No link provided in the request.")
-            return jsonify({"error": "No link provided"}), 400
-
-        link = data["link"].strip()
-        logging.info(f"Received link: {link}")
-
-        # Match links with DID in the profile section
-        did_in_profile_match = re.match(r"https?://bsky\.app/profile/(did:[^/]+)/post/([^/]+)", link)
-
-        # Match regular web links
-        web_match = re.match(r"https?://bsky\.app/profile/([^/]+)/post/([^/]+)", link)
-
-        if did_in_profile_match:
-            did, post_id = did_in_profile_match.groups()
-            handle = fetch_username_from_did(API_URL, access_token, did)
-        elif web_match:
-            handle, post_id = web_match.groups()
-            did = resolve_did(handle)
-        else:
-            return jsonify({"error": "Invalid link format."}), 400
-
-        at_uri = f"at://{did}/app.bsky.feed.post/{post_id}"
-        headers = {"Authorization": f"Bearer {access_token}"}
-
-        # Fetch reposts
-        reposts_response = requests.get(
-            f"{API_URL}/app.bsky.feed.getRepostedBy", headers=headers, params={"uri": at_uri}
-        )
-        reposts = reposts_response.json().get("repostedBy", []) if reposts_response.status_code == 200 else []
-
-        # Fetch likes
-        likes_response = requests.get(
-            f"{API_URL}/app.bsky.feed.getLikes", headers=headers, params={"uri": at_uri}
-        )
-        likes = likes_response.json().get("likes", []) if likes_response.status_code == 200 else []
-
-        # Generate charts
-        post_link = f"https://bsky.app/profile/{handle}/post/{post_id}"
-        likes_timestamps = [like["indexedAt"] for like in likes if "indexedAt" in like]
-        likes_chart_path = generate_likes_chart(handle, likes_timestamps, post_link) if likes else None
-        reposts_chart_path = generate_reposts_chart(handle, reposts) if reposts else None
-
-        response = {}
-        if likes_chart_path:
-            response["likes_chart"] = likes_chart_path
-        if reposts_chart_path:
-            response["reposts_chart"] = reposts_chart_path
-
-        return jsonify(response)
-    except Exception as e:
-        logging.error(f"Error generating charts: {e}")
-        return jsonify({"error": f"Error generating charts: {str(e)}"}), 500
-
-
-if __name__ == "__main__":
-    get_access_token()
-    app.run(host="0.0.0.0", port=8000, debug=False)
+import os
+import asyncio
+import hashlib
+import logging
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from functools import lru_cache
+from xml.sax.saxutils import escape
+import aiohttp
+import numpy as np
+import orjson
+import requests
+from PIL import Image, ImageDraw, ImageFont
+from requests.adapters import HTTPAdapter, Retry
+from cachetools import LRUCache, TTLCache
+from flask import Flask, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider
+from dotenv import load_dotenv
+import re
+
+# Load environment variables
+load_dotenv()
+
+# Logging configuration
+logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class OrJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, used for request parsing and jsonify."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# Flask app setup; charts are served by our own static route below
+app = Flask(__name__, static_folder=None)
+app.json = OrJSONProvider(app)
+
+# Bluesky API configuration
+API_URL = "https://bsky.social/xrpc"
+
+# Post-link formats: with a DID in the profile section, or a regular handle
+DID_LINK_RE = re.compile(r"https?://bsky\.app/profile/(did:[^/]+)/post/([^/]+)")
+WEB_LINK_RE = re.compile(r"https?://bsky\.app/profile/([^/]+)/post/([^/]+)")
+USERNAME = os.getenv("BLUESKY_USERNAME")
+PASSWORD = os.getenv("BLUESKY_APP_PASSWORD")
+
+# Authentication token
+access_token = None
+
+# Short-TTL response cache keyed by post URI, plus the last good payload
+# per URI as a stale fallback when the Bluesky API is erroring
+chart_cache = TTLCache(maxsize=1024, ttl=60)
+stale_cache = LRUCache(maxsize=1024)
+
+# Chart jobs by id; finished jobs linger long enough for clients to poll them.
+# TTLCache is not thread-safe and jobs is touched from both the job-loop
+# thread and request threads, so every access holds jobs_lock. The chart
+# caches above stay unguarded because only the job loop touches them.
+jobs = TTLCache(maxsize=1024, ttl=600)
+jobs_lock = threading.Lock()
+
+# Dedicated event loop thread that owns the aiohttp session and runs chart jobs
+job_loop = asyncio.new_event_loop()
+threading.Thread(target=job_loop.run_forever, name="chart-worker", daemon=True).start()
+
+# Shared requests session for the synchronous auth path, with keep-alive
+# and retries so repeated logins reuse one TLS connection
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+    ),
+)
+
+# Shared aiohttp session, created lazily inside the running event loop
+http_session = None
+
+# Bounds concurrent XRPC calls while paginating; created alongside the session
+api_semaphore = None
+
+
+async def get_http_session():
+    """Return the shared aiohttp session, creating it on first use."""
+    global http_session, api_semaphore
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=64),
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        api_semaphore = asyncio.Semaphore(8)
+    return http_session
+
+
+def retry_delay(headers, attempt):
+    """Pick a backoff delay from rate-limit headers, falling back to exponential."""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    reset = headers.get("ratelimit-reset")
+    if reset:
+        return max(float(reset) - time.time(), 0.5)
+    return 0.5 * (2 ** attempt)
+
+
+async def api_get(path, params, retries=3):
+    """GET a Bluesky XRPC endpoint with exponential backoff on 429/5xx."""
+    session = await get_http_session()
+    refreshed = False
+    attempt = 0
+    while attempt <= retries:
+        try:
+            async with api_semaphore:
+                async with session.get(f"{API_URL}/{path}", params=params) as response:
+                    if response.status == 401 and not refreshed:
+                        # Refresh and retry immediately without charging the
+                        # attempt budget; a second 401 falls through to
+                        # raise_for_status below
+                        logging.info("Access token rejected, refreshing login...")
+                        await asyncio.to_thread(get_access_token)
+                        refreshed = True
+                        continue
+                    if response.status == 429 or response.status >= 500:
+                        if attempt == retries:
+                            response.raise_for_status()
+                        delay = retry_delay(response.headers, attempt)
+                        logging.warning(f"{path} returned {response.status}, retrying in {delay:.1f}s...")
+                    else:
+                        response.raise_for_status()
+                        return await response.json()
+            attempt += 1
+            await asyncio.sleep(delay)
+        except aiohttp.ClientResponseError:
+            # Plain 4xx (bad post id, deleted post) is a final answer; the
+            # retryable statuses only reach raise_for_status once the
+            # attempt budget is spent, so never loop on a response error
+            raise
+        except aiohttp.ClientError as e:
+            if attempt == retries:
+                raise
+            delay = 0.5 * (2 ** attempt)
+            logging.warning(f"Error calling {path}: {e}, retrying in {delay:.1f}s...")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+def get_access_token():
+    """Authenticate with Bluesky and retrieve an access token."""
+    global access_token
+    try:
+        logging.info("Attempting to log into Bluesky...")
+        response = SESSION.post(
+            f"{API_URL}/com.atproto.server.createSession",
+            json={"identifier": USERNAME, "password": PASSWORD},
+        )
+        response.raise_for_status()
+        data = response.json()
+        access_token = data.get("accessJwt")
+        if not access_token:
+            raise ValueError("Access token not retrieved.")
+        if http_session is not None and not http_session.closed:
+            http_session.headers["Authorization"] = f"Bearer {access_token}"
+        logging.info("Login successful. Access token retrieved.")
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error during Bluesky authentication: {e}")
+        raise Exception("Authentication failed. Check your username and password.")
+
+
+async def resolve_did(handle):
+    """Resolve a Bluesky handle to its DID."""
+    try:
+        logging.info(f"Resolving DID for handle: {handle}")
+        data = await api_get("com.atproto.identity.resolveHandle", {"handle": handle})
+        did = data.get("did")
+        if did:
+            logging.info(f"Resolved DID for {handle}: {did}")
+            return did
+        else:
+            logging.error(f"Failed to resolve DID for handle: {handle}")
+            return None
+    except aiohttp.ClientError as e:
+        logging.error(f"Error resolving DID for handle {handle}: {e}")
+        return None
+
+
+async def fetch_username_from_did(did):
+    """Fetch the username (handle) associated with a DID using the Bluesky API."""
+    try:
+        data = await api_get("app.bsky.actor.getProfile", {"actor": did})
+        handle = data.get("handle")
+        logging.info(f"Resolved handle for DID {did}: {handle}")
+        return handle
+    except aiohttp.ClientError as e:
+        logging.error(f"Error fetching username for DID {did}: {e}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def png_optimizer():
+    """Find an optional PNG optimizer on PATH; returns the command prefix or None."""
+    oxipng = shutil.which("oxipng")
+    if oxipng:
+        return [oxipng, "-o", "2", "--strip", "safe"]
+    pngquant = shutil.which("pngquant")
+    if pngquant:
+        return [pngquant, "--force", "--skip-if-larger", "--ext", ".png"]
+    return None
+
+
+def optimize_png(path):
+    """Shrink a saved PNG in place with oxipng or pngquant when available."""
+    command = png_optimizer()
+    if not command:
+        return
+    try:
+        subprocess.run(command + [path], check=True, capture_output=True)
+        logging.info(f"Optimized {path} with {command[0]}")
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.warning(f"PNG optimization failed for {path}: {e}")
+
+
+@lru_cache(maxsize=None)
+def chart_fonts():
+    """Load the chart fonts once; parsing the TTF per render is wasted work."""
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", 14), ImageFont.truetype("DejaVuSans.ttf", 18)
+    except OSError:
+        default = ImageFont.load_default()
+        return default, default
+
+
+# Chart renders run in worker threads; each thread keeps one canvas and
+# clears it per render instead of reallocating the 1000x600 buffer
+canvas_local = threading.local()
+
+
+def chart_canvas(width, height):
+    """Return this thread's reusable chart canvas and draw handle, cleared to white."""
+    canvas = getattr(canvas_local, "canvas", None)
+    if canvas is None or canvas.size != (width, height):
+        canvas = Image.new("RGB", (width, height), "white")
+        canvas_local.canvas = canvas
+        canvas_local.draw = ImageDraw.Draw(canvas)
+    else:
+        canvas_local.draw.rectangle([(0, 0), (width, height)], fill="white")
+    return canvas, canvas_local.draw
+
+
+def generate_chart(colors, title, xlabel, ylabel, dates, counts, chart_image_path):
+    """General function to generate a styled bar chart, rendered directly with Pillow."""
+    width, height = 1000, 600
+    left, right, top, bottom = 90, 40, 90, 80
+    img, draw = chart_canvas(width, height)
+    font, title_font = chart_fonts()
+
+    plot_w = width - left - right
+    plot_h = height - top - bottom
+    counts = np.asarray(counts)
+    max_count = max(int(counts.max()), 1) if counts.size else 1
+
+    # Bar geometry: evenly spaced centers, bars at half the slot width
+    n = len(dates)
+    centers = left + (np.arange(n) + 0.5) * (plot_w / max(n, 1))
+    bar_w = plot_w / max(n, 1) * 0.5
+    bar_heights = counts / max_count * plot_h
+
+    for cx, bar_h, color in zip(centers, bar_heights, colors):
+        draw.rectangle([(cx - bar_w / 2, top + plot_h - bar_h), (cx + bar_w / 2, top + plot_h)], fill=color)
+
+    # Axes
+    draw.line([(left, top), (left, top + plot_h), (left + plot_w, top + plot_h)], fill="black")
+
+    # Y-axis ticks
+    for i in range(5):
+        y = top + plot_h - plot_h * i / 4
+        draw.line([(left - 4, y), (left, y)], fill="black")
+        draw.text((left - 8, y), f"{max_count * i / 4:g}", fill="black", font=font, anchor="rm")
+
+    # X-axis tick labels, thinned out when crowded
+    step = max(n // 12, 1)
+    for idx in range(0, n, step):
+        draw.line([(centers[idx], top + plot_h), (centers[idx], top + plot_h + 4)], fill="black")
+        draw.text(
+            (centers[idx], top + plot_h + 8),
+            dates[idx].strftime("%Y-%m-%d"),
+            fill="black",
+            font=font,
+            anchor="ma",
+        )
+
+    # Title and axis labels; the y-label is rendered separately and rotated
+    draw.text((width / 2, 16), title, fill="#ff69b4", font=title_font, anchor="ma", align="center")
+    draw.text((width / 2, height - 28), xlabel, fill="black", font=font, anchor="ma")
+    bbox = draw.textbbox((0, 0), ylabel, font=font)
+    ylabel_img = Image.new("RGB", (bbox[2] + 4, bbox[3] + 4), "white")
+    ImageDraw.Draw(ylabel_img).text((2, 2), ylabel, fill="black", font=font)
+    ylabel_img = ylabel_img.rotate(90, expand=True)
+    img.paste(ylabel_img, (12, int(top + plot_h / 2 - ylabel_img.height / 2)))
+
+    # optimize=True would force zlib level 9; level 1 saves much faster and
+    # these mostly-flat charts compress nearly as well
+    img.save(chart_image_path, "PNG", compress_level=1)
+    optimize_png(chart_image_path)
+    logging.info(f"Chart saved to {chart_image_path}")
+
+
+# Charts with at most this many bars are emitted as SVG instead of PNG
+SVG_BAR_THRESHOLD = 64
+
+
+def chart_path(kind, cache_key, ext="png"):
+    """Return the on-disk path for a chart, named by a hash of its cache key."""
+    digest = hashlib.sha1(cache_key.encode()).hexdigest()[:16]
+    return f"static/{kind}_{digest}.{ext}"
+
+
+def daily_counts(timestamps):
+    """Bucket ISO timestamps by day; returns sorted dates and their counts."""
+    days = np.array([ts[:10] for ts in timestamps], dtype="datetime64[D]")
+    unique_days, counts = np.unique(days, return_counts=True)
+    return unique_days.astype(object), counts
+
+
+def generate_chart_svg(colors, title, xlabel, ylabel, dates, counts, chart_image_path):
+    """Emit a bar chart as SVG markup; small charts need no rasterization at all."""
+    width, height = 1000, 600
+    left, right, top, bottom = 90, 40, 90, 80
+    plot_w = width - left - right
+    plot_h = height - top - bottom
+    n = len(dates)
+    max_count = max(int(max(counts)), 1) if n else 1
+    slot = plot_w / max(n, 1)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        'font-family="sans-serif" font-size="14">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+    ]
+    for i, (count, color) in enumerate(zip(counts, colors)):
+        bar_h = count / max_count * plot_h
+        x = left + (i + 0.25) * slot
+        y = top + plot_h - bar_h
+        parts.append(f'<rect x="{x:.1f}" y="{y:.1f}" width="{slot * 0.5:.1f}" height="{bar_h:.1f}" fill="{color}"/>')
+
+    # Axes and y-axis ticks
+    parts.append(f'<path d="M {left} {top} V {top + plot_h} H {left + plot_w}" stroke="black" fill="none"/>')
+    for i in range(5):
+        y = top + plot_h - plot_h * i / 4
+        parts.append(f'<line x1="{left - 4}" y1="{y:.1f}" x2="{left}" y2="{y:.1f}" stroke="black"/>')
+        parts.append(
+            f'<text x="{left - 8}" y="{y:.1f}" text-anchor="end" dominant-baseline="middle">'
+            f"{max_count * i / 4:g}</text>"
+        )
+
+    # X-axis tick labels, thinned out when crowded
+    step = max(n // 12, 1)
+    for idx in range(0, n, step):
+        cx = left + (idx + 0.5) * slot
+        parts.append(f'<line x1="{cx:.1f}" y1="{top + plot_h}" x2="{cx:.1f}" y2="{top + plot_h + 4}" stroke="black"/>')
+        parts.append(
+            f'<text x="{cx:.1f}" y="{top + plot_h + 22}" text-anchor="middle">'
+            f'{dates[idx].strftime("%Y-%m-%d")}</text>'
+        )
+
+    # Title lines, x-label, and the rotated y-label
+    for i, line in enumerate(title.split("\n")):
+        parts.append(
+            f'<text x="{width / 2}" y="{34 + i * 24}" text-anchor="middle" fill="#ff69b4" font-size="18">'
+            f"{escape(line)}</text>"
+        )
+    parts.append(f'<text x="{width / 2}" y="{height - 20}" text-anchor="middle">{escape(xlabel)}</text>')
+    mid_y = top + plot_h / 2
+    parts.append(
+        f'<text x="20" y="{mid_y}" text-anchor="middle" transform="rotate(-90 20 {mid_y})">{escape(ylabel)}</text>'
+    )
+    parts.append("</svg>")
+
+    with open(chart_image_path, "w") as f:
+        f.write("\n".join(parts))
+    logging.info(f"Chart saved to {chart_image_path}")
+
+
+def generate_timeline_chart(kind, color, title, ylabel, timestamps, at_uri):
+    """Bucket timestamps by day and render a single timeline bar chart."""
+    logging.info(f"Generating {kind} chart...")
+    sorted_dates, counts = daily_counts(timestamps)
+    colors = [color for _ in sorted_dates]
+    # Fold the dataset into the cache key so the filename changes whenever
+    # the data does, making the immutable browser caching below safe
+    newest = sorted_dates[-1].isoformat() if len(sorted_dates) else ""
+    cache_key = f"{at_uri}|{int(counts.sum())}|{newest}"
+    if len(sorted_dates) <= SVG_BAR_THRESHOLD:
+        chart_image_path = chart_path(kind, cache_key, ext="svg")
+        generate_chart_svg(colors, title, "Date", ylabel, sorted_dates, counts, chart_image_path)
+    else:
+        chart_image_path = chart_path(kind, cache_key)
+        generate_chart(colors, title, "Date", ylabel, sorted_dates, counts, chart_image_path)
+    return chart_image_path
+
+
+def generate_likes_chart(handle, likes, post_link, at_uri):
+    """Generate and save a likes chart."""
+    like_timestamps = (like["indexedAt"] for like in likes if "indexedAt" in like)
+    return generate_timeline_chart(
+        "likes",
+        "#ff69b4",
+        f"Likes Over Time for @{handle}\nPost: {post_link}",
+        "Number of Likes",
+        like_timestamps,
+        at_uri,
+    )
+
+
+def generate_reposts_chart(handle, reposts, at_uri):
+    """Generate and save a reposts chart."""
+    repost_timestamps = (repost["indexedAt"] for repost in reposts if "indexedAt" in repost)
+    return generate_timeline_chart(
+        "reposts",
+        "#ff85c0",
+        f"Reposts Over Time for @{handle}",
+        "Number of Reposts",
+        repost_timestamps,
+        at_uri,
+    )
+
+
+@app.route("/")
+def home():
+    """Render the home page."""
+    return """
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Bluesky Data Visualizer</title>
+        <style>
+            body {
+                font-family: Arial, sans-serif;
+                margin: 0;
+                padding: 0;
+                background: linear-gradient(135deg, #ff69b4, #ff85c0, #ff99cc);
+                color: white;
+                text-align: center;
+            }
+            h1 {
+                font-size: 3em;
+                margin-top: 20px;
+                text-shadow: 2px 2px 5px rgba(0, 0, 0, 0.3);
+            }
+            form {
+                margin: 20px auto;
+                padding: 15px;
+                background-color: rgba(255, 255, 255, 0.1);
+                border-radius: 10px;
+                box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
+                max-width: 400px;
+            }
+            label {
+                font-size: 1.2em;
+                display: block;
+                margin-bottom: 10px.
+            input {
+                width: 90%;
+                padding: 10px;
+                margin-bottom: 20px;
+                border: none;
+                border-radius: 5px;
+                box-shadow: 0 2px 5px rgba(0, 0, 0, 0.1);
+                font-size: 1em;
+            }
+            button {
+                background-color: #ff69b4;
+                color: white;
+                padding: 10px 20px;
+                border: none;
+                border-radius: 5px;
+                font-size: 1em;
+                cursor: pointer;
+                transition: background-color 0.3s ease;
+            }
+            button:hover {
+                background-color: #ff85c0;
+            }
+            #result img {
+                margin-top: 20px;
+                max-width: 100%;
+                border: 3px solid #ff85c0;
+                border-radius: 10px;
+                box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
+            }
+        </style>
+    </head>
+    <body>
+        <h1>Bluesky Data Visualizer</h1>
+        <form id="chart-form" method="post" action="/generate">
+            <label for="link">Enter a Bluesky post link:</label>
+            <input type="text" id="link" name="link" placeholder="https://bsky.app/profile/..." required>
+            <button type="submit">Generate Charts</button>
+        </form>
+        <div id="result">
+            <!-- Graph or chart will appear here -->
+        </div>
+        <script>
+            const form = document.getElementById("chart-form");
+            form.addEventListener("submit", async (event) => {
+                event.preventDefault();
+                const link = document.getElementById("link").value;
+                const response = await fetch("/generate", {
+                    method: "POST",
+                    headers: { "Content-Type": "application/json" },
+                    body: JSON.stringify({ link }),
+                });
+                const data = await response.json();
+                if (!response.ok) {
+                    alert("Error: " + data.error);
+                    return;
+                }
+                let job = data;
+                while (job.status === "pending") {
+                    await new Promise((resolve) => setTimeout(resolve, 500));
+                    const poll = await fetch(data.status_url);
+                    job = await poll.json();
+                }
+                const result = job.result || {};
+                if (job.status === "done" && (result.likes_chart || result.reposts_chart)) {
+                    const resultDiv = document.getElementById("result");
+                    resultDiv.innerHTML = `
+                        ${result.likes_chart ? `<img src="/${result.likes_chart}" alt="Likes Chart">` : ''}
+                        ${result.reposts_chart ? `<img src="/${result.reposts_chart}" alt="Reposts Chart">` : ''}
+                    `;
+                } else {
+                    alert("Error: " + (job.error || "No charts could be generated."));
+                }
+            });
+        </script>
+    </body>
+    </html>
+    """
+
+
+async def fetch_all(path, key, at_uri):
+    """Walk an endpoint's cursor pages and return the concatenated records."""
+    records = []
+    cursor = None
+    while True:
+        params = {"uri": at_uri, "limit": 100}
+        if cursor:
+            params["cursor"] = cursor
+        data = await api_get(path, params)
+        records.extend(data.get(key, []))
+        cursor = data.get("cursor")
+        if not cursor:
+            break
+    return records
+
+
+async def fetch_reposts(at_uri):
+    """Fetch all users who reposted the given post."""
+    return await fetch_all("app.bsky.feed.getRepostedBy", "repostedBy", at_uri)
+
+
+async def fetch_likes(at_uri):
+    """Fetch all likes on the given post."""
+    return await fetch_all("app.bsky.feed.getLikes", "likes", at_uri)
+
+
+@app.route("/static/<path:filename>")
+def serve_chart(filename):
+    """Serve generated charts with long-lived, immutable cache headers."""
+    response = send_from_directory("static", filename)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+async def build_charts(link):
+    """Resolve a post link, fetch its likes and reposts, and render both charts."""
+    if not access_token:
+        await asyncio.to_thread(get_access_token)
+
+    did_in_profile_match = DID_LINK_RE.match(link)
+    web_match = WEB_LINK_RE.match(link)
+
+    if did_in_profile_match:
+        # The at:// URI only needs the DID, so the handle lookup for the
+        # chart titles can overlap with the likes/reposts fetches below
+        did, post_id = did_in_profile_match.groups()
+        handle = None
+    elif web_match:
+        handle, post_id = web_match.groups()
+        did = await resolve_did(handle)
+    else:
+        raise ValueError("Invalid link format.")
+
+    at_uri = f"at://{did}/app.bsky.feed.post/{post_id}"
+
+    # Serve repeat visits to the same post from the cache
+    cached = chart_cache.get(at_uri)
+    if cached is not None:
+        logging.info(f"Cache hit for {at_uri}")
+        return cached
+
+    # Fetch likes, reposts, and any pending handle lookup concurrently
+    try:
+        if handle is None:
+            handle, likes, reposts = await asyncio.gather(
+                fetch_username_from_did(did), fetch_likes(at_uri), fetch_reposts(at_uri)
+            )
+        else:
+            likes, reposts = await asyncio.gather(fetch_likes(at_uri), fetch_reposts(at_uri))
+    except aiohttp.ClientError as e:
+        stale = stale_cache.get(at_uri)
+        if stale is not None:
+            logging.warning(f"Bluesky API error ({e}), serving stale payload for {at_uri}")
+            return stale
+        raise
+
+    # Render both charts concurrently in worker threads; sleep(0) stands
+    # in as a no-op returning None when there is nothing to chart
+    post_link = f"https://bsky.app/profile/{handle}/post/{post_id}"
+    likes_chart_path, reposts_chart_path = await asyncio.gather(
+        asyncio.to_thread(generate_likes_chart, handle, likes, post_link, at_uri)
+        if likes
+        else asyncio.sleep(0),
+        asyncio.to_thread(generate_reposts_chart, handle, reposts, at_uri)
+        if reposts
+        else asyncio.sleep(0),
+    )
+
+    response = {}
+    if likes_chart_path:
+        response["likes_chart"] = likes_chart_path
+    if reposts_chart_path:
+        response["reposts_chart"] = reposts_chart_path
+
+    chart_cache[at_uri] = response
+    stale_cache[at_uri] = response
+    return response
+
+
+async def run_chart_job(job_id, link):
+    """Run one queued chart job and record its outcome for polling clients."""
+    try:
+        result = await build_charts(link)
+        with jobs_lock:
+            jobs[job_id] = {"status": "done", "result": result}
+    except Exception as e:
+        logging.error(f"Error generating charts: {e}")
+        with jobs_lock:
+            jobs[job_id] = {"status": "error", "error": f"Error generating charts: {str(e)}"}
+
+
+@app.route("/generate", methods=["POST"])
+def generate_charts():
+    """Queue chart generation for a Bluesky link and return a polling URL."""
+    data = request.json
+    if not data or "link" not in data:
+        logging.error("No link provided in the request.")
+        return jsonify({"error": "No link provided"}), 400
+
+    link = data["link"].strip()
+    logging.info(f"Received link: {link}")
+
+    if not (DID_LINK_RE.match(link) or WEB_LINK_RE.match(link)):
+        return jsonify({"error": "Invalid link format."}), 400
+
+    job_id = uuid.uuid4().hex
+    with jobs_lock:
+        jobs[job_id] = {"status": "pending"}
+    asyncio.run_coroutine_threadsafe(run_chart_job(job_id, link), job_loop)
+    return jsonify({"job_id": job_id, "status": "pending", "status_url": f"/generate/status/{job_id}"}), 202
+
+
+@app.route("/generate/status/<job_id>")
+def chart_job_status(job_id):
+    """Report the state of a queued chart job."""
+    with jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+    return jsonify(job)
+
+
+if __name__ == "__main__":
+    get_access_token()
+    app.run(host="0.0.0.0", port=8000, debug=False)
@@ -0,0 +1,16 @@
+"""Gunicorn configuration for production deployments.
+
+The views themselves are synchronous and cheap: /generate enqueues a
+job and returns, and the real work (API fetches, chart rendering) runs
+on the app's dedicated background event loop thread. A single gthread
+worker keeps the in-process job store visible to every poll, while its
+request threads handle concurrent clients; gevent's monkey-patching
+would only interfere with that loop thread.
+"""
+
+bind = "0.0.0.0:8000"
+workers = 1
+worker_class = "gthread"
+threads = 4
+timeout = 60
+accesslog = "-"